@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -11,11 +12,43 @@ class Settings:
     GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_FILE", "credentials.json")
     GOOGLE_TOKEN_FILE = os.getenv("GOOGLE_TOKEN_FILE", "token.json")
     
+    # Startup settings
+    # Defer Google client imports and construction to a background warm-up task
+    DRIVE_LAZY_STARTUP = os.getenv("DRIVE_LAZY_STARTUP", "true").lower() == "true"
+    # Warm-up retries with exponential backoff from RETRY_DELAY up to MAX_RETRY_DELAY seconds
+    DRIVE_WARMUP_RETRY_DELAY = float(os.getenv("DRIVE_WARMUP_RETRY_DELAY", "2"))
+    DRIVE_WARMUP_MAX_RETRY_DELAY = float(os.getenv("DRIVE_WARMUP_MAX_RETRY_DELAY", "60"))
+    
+    # Media optimization settings
+    # Strip metadata, fix orientation and re-encode large photos before uploading
+    MEDIA_OPTIMIZATION_ENABLED = os.getenv("MEDIA_OPTIMIZATION_ENABLED", "false").lower() == "true"
+    MEDIA_REENCODE_THRESHOLD_BYTES = int(os.getenv("MEDIA_REENCODE_THRESHOLD_BYTES", str(2 * 1024 * 1024)))
+    MEDIA_JPEG_QUALITY = int(os.getenv("MEDIA_JPEG_QUALITY", "85"))
+    MEDIA_MAX_DIMENSION = int(os.getenv("MEDIA_MAX_DIMENSION", "2560"))
+    MEDIA_KEEP_ORIGINALS = os.getenv("MEDIA_KEEP_ORIGINALS", "false").lower() == "true"
+    MEDIA_OPTIMIZER_WORKERS = int(os.getenv("MEDIA_OPTIMIZER_WORKERS", "1"))
+    
+    # Admin / profiling settings
+    # Admin endpoints are disabled unless ADMIN_TOKEN is set
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    PROFILER_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILER_SAMPLE_INTERVAL_MS", "5"))
+    PROFILER_MAX_DURATION = float(os.getenv("PROFILER_MAX_DURATION", "300"))
+    # Directory shared by all workers of a host for profiling commands and results
+    PROFILER_SHARED_DIR = os.getenv(
+        "PROFILER_SHARED_DIR", os.path.join(tempfile.gettempdir(), "dugun-drive-profiling")
+    )
+    PROFILER_POLL_INTERVAL = float(os.getenv("PROFILER_POLL_INTERVAL", "1"))
+    
     # API settings
     API_TITLE = "Google Drive API"
     API_VERSION = "1.0.0"
     API_DESCRIPTION = "Google Drive integration API"
     
+    # Static web client settings
+    # index.html is split into hashed, precompressed assets under STATIC_BUILD_DIR
+    STATIC_SOURCE_DIR = os.getenv("STATIC_SOURCE_DIR", "app/static")
+    STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", "build/static")
+    
     # CORS settings
     ALLOWED_ORIGINS = [
         "http://localhost:3000",
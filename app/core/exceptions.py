@@ -16,4 +16,8 @@ class PermissionException(GoogleDriveException):
 
 class UploadException(GoogleDriveException):
     """Exception raised for upload errors"""
-    pass 
\ No newline at end of file
+    pass 
+
+class InvalidPageTokenException(GoogleDriveException):
+    """Exception raised for malformed or foreign page tokens"""
+    pass
@@ -0,0 +1,16 @@
+import os
+import tempfile
+from typing import Union
+
+def atomic_write(path: str, data: Union[str, bytes]) -> None:
+    """Replace ``path`` in one step, so other workers never read a partially written file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w' if isinstance(data, str) else 'wb') as f:
+            f.write(data)
+        # mkstemp creates files readable by the owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class FileInfo(BaseModel):
@@ -19,6 +19,10 @@ class UploadResponse(BaseModel):
     file_id: Optional[str] = None
     file_name: Optional[str] = None
     message: str
+    original_size: Optional[int] = None
+    uploaded_size: Optional[int] = None
+    bytes_saved: Optional[int] = None
+    original_file_id: Optional[str] = None
 
 class FileListResponse(BaseModel):
     """File list response model"""
@@ -30,4 +34,31 @@ class ErrorResponse(BaseModel):
     """Error response model"""
     error: str
     message: str
-    status_code: int 
\ No newline at end of file
+    status_code: int
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response model"""
+    status: str
+    ready: bool
+    backend: Optional[str] = None
+    timings_ms: Dict[str, float] = {}
+    error: Optional[str] = None
+
+class WorkerProfilingStatus(BaseModel):
+    """Sampling profiler status of a single worker"""
+    pid: int
+    running: bool
+    samples: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ProfilingStatus(BaseModel):
+    """Sampling profiler status model, aggregated over all workers"""
+    session: Optional[str] = None
+    running: bool
+    route: Optional[str] = None
+    remaining_requests: int
+    samples: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    workers: List[WorkerProfilingStatus] = []
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Union
+
+from app.core.exceptions import InvalidPageTokenException
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+CURSOR_VERSION = 1
+_CURSOR_HEADER = struct.Struct('>Bq')
+
+def to_epoch_us(value: Union[datetime, str, None]) -> int:
+    """Convert a timestamp (datetime or RFC 3339 string) to integer microseconds since the epoch"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def from_epoch_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+class PageCursor(NamedTuple):
+    """Keyset position: files are ordered by (created_time, id)"""
+    created_us: int
+    file_id: str
+
+    @classmethod
+    def for_file(cls, created_time: Union[datetime, str, None], file_id: str) -> 'PageCursor':
+        return cls(to_epoch_us(created_time), file_id)
+
+    @property
+    def created_time(self) -> datetime:
+        return from_epoch_us(self.created_us)
+
+def encode_cursor(cursor: PageCursor) -> str:
+    """Encode a cursor as an opaque, URL-safe page token"""
+    raw = _CURSOR_HEADER.pack(CURSOR_VERSION, cursor.created_us) + cursor.file_id.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+def decode_cursor(token: str) -> PageCursor:
+    """Decode a page token produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        version, created_us = _CURSOR_HEADER.unpack_from(raw)
+        file_id = raw[_CURSOR_HEADER.size:].decode('utf-8')
+    except (binascii.Error, struct.error, UnicodeDecodeError, ValueError):
+        raise InvalidPageTokenException(f"Invalid page token: {token}")
+    if version != CURSOR_VERSION or not file_id:
+        raise InvalidPageTokenException(f"Invalid page token: {token}")
+    return PageCursor(created_us, file_id)
@@ -0,0 +1,568 @@
+import fcntl
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+from starlette.routing import compile_path
+
+from app.core.config import settings
+from app.core.fs import atomic_write
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def compile_route(route: str) -> Pattern:
+    """Match a route template (``/files/{file_id}/download``) or a prefix ending in ``*``"""
+    if route.endswith('*'):
+        return re.compile(re.escape(route[:-1]))
+    regex, _, _ = compile_path(route)
+    return regex
+
+class SharedCounter:
+    """Integer counter in a file, shared by all workers through flock"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def set(self, value: int) -> None:
+        atomic_write(self.path, str(value))
+
+    def take(self) -> bool:
+        """Decrement the counter; False once it has reached zero"""
+        try:
+            with open(self.path, 'r+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                value = int(f.read() or 0)
+                if value <= 0:
+                    return False
+                f.seek(0)
+                f.truncate()
+                f.write(str(value - 1))
+                return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def value(self) -> int:
+        try:
+            with open(self.path) as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+# Leaf frames of threads parked waiting for work: (file basename, function)
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),             # Condition/Event.wait, queue.Queue.get (AnyIO workers)
+    ('thread.py', '_worker'),             # ThreadPoolExecutor worker blocked in SimpleQueue.get
+    ('selectors.py', 'select'),           # event loop with nothing to run
+}
+
+class SamplingProfiler:
+    """Stack-sampling profiler for the current worker process.
+
+    Samples every thread from a background thread, either for a fixed time
+    window or while requests to one route are in flight. Each run belongs to a
+    session; requests are attributed to the session that was active when they
+    started, so leftovers from a previous run cannot skew the next one.
+
+    Route mode only decides *when* to sample: every busy thread of the process
+    is recorded, including concurrent requests to other routes. Threads parked
+    in a wait are skipped unless ``idle`` is set.
+    """
+
+    BUDGET_CHECK_INTERVAL = 0.25
+    SKIPPED_THREADS = ('profiling-watcher',)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set when a profiled request starts, so the sampler does not sleep through it
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.session: Optional[str] = None
+        self.route: Optional[str] = None
+        self.route_pattern: Optional[Pattern] = None
+        self.budget: Optional[SharedCounter] = None
+        self.active_requests = 0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = 0.005
+        self.idle = False
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.on_finish: Optional[Callable[['SamplingProfiler'], None]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, session: str, duration: Optional[float] = None, route: Optional[str] = None,
+              budget: Optional[SharedCounter] = None, interval: float = 0.005, idle: bool = False,
+              on_finish: Optional[Callable[['SamplingProfiler'], None]] = None) -> None:
+        """Start sampling for ``duration`` seconds, limited to ``route`` requests if given"""
+        with self._lock:
+            if self.running:
+                raise RuntimeError("Profiler is already running")
+            self.session = session
+            self.stacks = Counter()
+            self.samples = 0
+            self.interval = interval
+            self.idle = idle
+            # Requests of earlier sessions are ignored in request_finished()
+            self.active_requests = 0
+            self.budget = budget
+            self.route = route
+            self.route_pattern = compile_route(route) if route else None
+            self.on_finish = on_finish
+            self.started_at = datetime.utcnow()
+            self.finished_at = None
+            self._stop.clear()
+            self._wake.clear()
+            deadline = time.monotonic() + duration if duration else None
+            self._thread = threading.Thread(
+                target=self._run, args=(deadline,), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; collected stacks stay available until the next start"""
+        self.route_pattern = None
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def request_started(self, path: str) -> Optional[Tuple[str, int]]:
+        """Claim a request for the profiled route.
+
+        Returns the session it belongs to and the sample count at its start,
+        to be passed back to request_finished().
+        """
+        pattern = self.route_pattern
+        if pattern is None or not pattern.match(path):
+            return None
+        # Under the lock, so the sampler cannot finish between the claim and the count
+        with self._lock:
+            if self.budget is None or not self.budget.take():
+                return None
+            self.active_requests += 1
+            claim = (self.session, self.samples)
+        self._wake.set()
+        return claim
+
+    def request_finished(self, claim: Tuple[str, int]) -> None:
+        session, samples_at_start = claim
+        with self._lock:
+            if session != self.session:
+                return
+            if self.samples == samples_at_start and self.running:
+                # Finished between two ticks; record it rather than losing it
+                self._sample(self._thread.ident)
+            self.active_requests -= 1
+
+    def collapsed(self) -> str:
+        """Return samples in Brendan Gregg's collapsed-stack format"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "running": self.running,
+            "samples": self.samples,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def _run(self, deadline: Optional[float]) -> None:
+        own_id = threading.get_ident()
+        try:
+            while not self._stop.is_set():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                with self._lock:
+                    waiting = self.route_pattern is not None and self.active_requests <= 0
+                    if waiting and (self.budget is None or self.budget.value() <= 0):
+                        # Every worker has used up the shared budget
+                        break
+                    if not waiting:
+                        self._sample(own_id)
+                if waiting:
+                    # Route mode: sleep until a profiled request starts
+                    self._wake.wait(self.BUDGET_CHECK_INTERVAL)
+                    self._wake.clear()
+                else:
+                    self._stop.wait(self.interval)
+        finally:
+            self.route_pattern = None
+            self.finished_at = datetime.utcnow()
+            if self.on_finish is not None:
+                self.on_finish(self)
+
+    def _sample(self, own_id: int) -> None:
+        """Record the stack of every thread once; the caller holds ``_lock``"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or names.get(thread_id) in self.SKIPPED_THREADS:
+                continue
+            if not self.idle and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+class MemoryTracker:
+    """tracemalloc snapshots of the current worker, dumped to disk for later diffs"""
+
+    def take_snapshot(self, path: str, frames: int = 25, limit: int = 20) -> dict:
+        """Take a snapshot into ``path``, starting tracemalloc first if needed"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        snapshot.dump(path)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "pid": os.getpid(),
+            "traced_current": current,
+            "traced_peak": peak,
+            "top": [self._stat(stat) for stat in snapshot.statistics('lineno')[:limit]],
+        }
+
+    def diff(self, base_path: str, target_path: str, limit: int = 20) -> dict:
+        """Compare two dumped snapshots"""
+        base = tracemalloc.Snapshot.load(base_path)
+        target = tracemalloc.Snapshot.load(target_path)
+        stats = target.compare_to(base, 'lineno')
+        return {
+            "size_diff": sum(stat.size_diff for stat in stats),
+            "top": [self._stat(stat) for stat in stats[:limit]],
+        }
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    @staticmethod
+    def _stat(stat) -> dict:
+        frame = stat.traceback[0]
+        return {
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size": stat.size,
+            "count": stat.count,
+            "size_diff": getattr(stat, 'size_diff', None),
+            "count_diff": getattr(stat, 'count_diff', None),
+        }
+
+class ProfilingCoordinator:
+    """Arms profiling in every gunicorn worker and merges their results.
+
+    Commands are written to a directory shared by the workers of a host; each
+    worker polls it from a watcher thread and writes its own results back,
+    keyed by pid. The admin endpoints can therefore be served by any worker.
+    """
+
+    MAX_MEMORY_SNAPSHOTS = 10
+
+    def __init__(self, directory: str, poll_interval: float = 1.0):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        self._seen_mtimes = {}
+        self._memory_seq = 0
+        self._poll_lock = threading.Lock()
+
+    @property
+    def control_path(self) -> str:
+        return os.path.join(self.directory, 'control.json')
+
+    @property
+    def memory_path(self) -> str:
+        return os.path.join(self.directory, 'memory.json')
+
+    def session_dir(self, session: str) -> str:
+        return os.path.join(self.directory, 'sessions', session)
+
+    def memory_dir(self, pid: int) -> str:
+        return os.path.join(self.directory, 'memory', str(pid))
+
+    def start_watcher(self) -> None:
+        """Start polling for commands from other workers"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Only react to memory commands issued after this worker started
+        self._memory_seq = (_read_json(self.memory_path) or {}).get('seq', 0)
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="profiling-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._watcher_stop.set()
+        sampling_profiler.stop()
+
+    def poll(self) -> None:
+        """Apply commands whose files changed since the last poll"""
+        with self._poll_lock:
+            for path, handler in ((self.control_path, self._apply_control), (self.memory_path, self._apply_memory)):
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if self._seen_mtimes.get(path) == mtime:
+                    continue
+                self._seen_mtimes[path] = mtime
+                command = _read_json(path)
+                if command is None:
+                    continue
+                try:
+                    handler(command)
+                except Exception as e:
+                    print(f"Warning: Profiling command failed: {str(e)}")
+
+    def _watch(self) -> None:
+        while not self._watcher_stop.wait(self.poll_interval):
+            self.poll()
+
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, '.lock'), 'w')
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    # Sampling profiler
+
+    def arm(self, duration: float, route: Optional[str] = None, requests: Optional[int] = None,
+            interval: float = 0.005, idle: bool = False) -> dict:
+        """Start a profiling session in every worker"""
+        with self._locked():
+            if self.status()["running"]:
+                raise RuntimeError("Profiler is already running")
+            session = uuid.uuid4().hex[:12]
+            shutil.rmtree(os.path.join(self.directory, 'sessions'), ignore_errors=True)
+            os.makedirs(self.session_dir(session))
+            if route:
+                SharedCounter(os.path.join(self.session_dir(session), 'remaining')).set(requests or 0)
+            atomic_write(self.control_path, json.dumps({
+                "session": session,
+                "action": "start",
+                "started_at": time.time(),
+                "duration": duration,
+                "route": route,
+                "interval": interval,
+                "idle": idle,
+            }))
+        self.poll()
+        return self.status()
+
+    def disarm(self) -> dict:
+        """Stop the current session in every worker"""
+        with self._locked():
+            control = _read_json(self.control_path)
+            if control and control["action"] == "start":
+                control["action"] = "stop"
+                atomic_write(self.control_path, json.dumps(control))
+        self.poll()
+        return self.status()
+
+    def _apply_control(self, control: dict) -> None:
+        session = control["session"]
+        if control["action"] == "stop":
+            if sampling_profiler.session == session:
+                sampling_profiler.stop()
+            return
+        if sampling_profiler.session == session:
+            return
+        remaining = control["started_at"] + control["duration"] - time.time()
+        if remaining <= 0:
+            return
+        sampling_profiler.stop()
+        budget = None
+        if control["route"]:
+            budget = SharedCounter(os.path.join(self.session_dir(session), 'remaining'))
+        sampling_profiler.start(
+            session,
+            duration=remaining,
+            route=control["route"],
+            budget=budget,
+            interval=control["interval"],
+            idle=control.get("idle", False),
+            on_finish=self._save_result
+        )
+        self._save_status(sampling_profiler)
+
+    def _save_status(self, profiler: SamplingProfiler) -> None:
+        directory = self.session_dir(profiler.session)
+        if os.path.isdir(directory):
+            atomic_write(os.path.join(directory, f"{os.getpid()}.json"), json.dumps(profiler.status()))
+
+    def _save_result(self, profiler: SamplingProfiler) -> None:
+        directory = self.session_dir(profiler.session)
+        if not os.path.isdir(directory):
+            # A newer session replaced this one
+            return
+        atomic_write(os.path.join(directory, f"{os.getpid()}.collapsed"), profiler.collapsed())
+        status = profiler.status()
+        # The sampler thread calls this on its way out, while it still counts as alive
+        status["running"] = False
+        atomic_write(os.path.join(directory, f"{os.getpid()}.json"), json.dumps(status))
+
+    def workers(self, session: str) -> List[dict]:
+        directory = self.session_dir(session)
+        workers = []
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            if not name.endswith('.json'):
+                continue
+            worker = _read_json(os.path.join(directory, name))
+            if worker is None:
+                continue
+            worker["running"] = worker["running"] and _pid_alive(worker["pid"])
+            workers.append(worker)
+        return workers
+
+    def collapsed(self) -> str:
+        """Merge the collapsed stacks written by every worker"""
+        control = _read_json(self.control_path)
+        merged: Counter = Counter()
+        directory = self.session_dir(control["session"]) if control else None
+        for name in os.listdir(directory) if directory and os.path.isdir(directory) else []:
+            if not name.endswith('.collapsed'):
+                continue
+            with open(os.path.join(directory, name)) as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack:
+                        merged[stack] += int(count)
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+    def status(self) -> dict:
+        control = _read_json(self.control_path)
+        if control is None:
+            return {"session": None, "running": False, "remaining_requests": 0,
+                    "samples": 0, "workers": []}
+        workers = self.workers(control["session"])
+        running = any(worker["running"] for worker in workers)
+        finished = [worker["finished_at"] for worker in workers if worker["finished_at"]]
+        remaining = 0
+        if control["route"]:
+            remaining = SharedCounter(os.path.join(self.session_dir(control["session"]), 'remaining')).value()
+        return {
+            "session": control["session"],
+            "running": running,
+            "route": control["route"],
+            "remaining_requests": remaining,
+            "samples": sum(worker["samples"] for worker in workers),
+            "started_at": datetime.utcfromtimestamp(control["started_at"]),
+            "finished_at": max(finished) if finished and not running else None,
+            "workers": workers,
+        }
+
+    # tracemalloc
+
+    def request_memory(self, action: str, frames: int = 25) -> int:
+        """Ask every worker to take a snapshot or stop tracing; returns the command sequence number"""
+        with self._locked():
+            seq = (_read_json(self.memory_path) or {}).get('seq', 0) + 1
+            atomic_write(self.memory_path, json.dumps({"seq": seq, "action": action, "frames": frames}))
+        self.poll()
+        return seq
+
+    def _apply_memory(self, command: dict) -> None:
+        if command["seq"] <= self._memory_seq:
+            return
+        self._memory_seq = command["seq"]
+        directory = self.memory_dir(os.getpid())
+        if command["action"] == "stop":
+            memory_tracker.stop()
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+        os.makedirs(directory, exist_ok=True)
+        memory_tracker.take_snapshot(os.path.join(directory, f"{command['seq']:08d}.snapshot"), frames=command["frames"])
+        snapshots = sorted(os.listdir(directory))
+        for name in snapshots[:-self.MAX_MEMORY_SNAPSHOTS]:
+            os.unlink(os.path.join(directory, name))
+
+    def memory_snapshots(self) -> Dict[int, Dict[int, str]]:
+        """Snapshot files per worker pid, keyed by the snapshot ID returned by request_memory()"""
+        root = os.path.join(self.directory, 'memory')
+        snapshots = {}
+        for pid in os.listdir(root) if os.path.isdir(root) else []:
+            names = sorted(name for name in os.listdir(os.path.join(root, pid)) if name.endswith('.snapshot'))
+            snapshots[int(pid)] = {int(name[:-len('.snapshot')]): os.path.join(root, pid, name) for name in names}
+        return snapshots
+
+    def memory_diff(self, base_id: Optional[int] = None, target_id: Optional[int] = None,
+                    limit: int = 20) -> List[dict]:
+        """Diff two snapshots of each worker by snapshot ID (defaults to each worker's last two)"""
+        diffs = []
+        for pid, paths in sorted(self.memory_snapshots().items()):
+            seqs = sorted(paths)
+            base_seq = base_id if base_id is not None else (seqs[-2] if len(seqs) > 1 else None)
+            target_seq = target_id if target_id is not None else (seqs[-1] if seqs else None)
+            if base_seq not in paths or target_seq not in paths:
+                # Pruned, or the worker started after the snapshot was taken
+                continue
+            diff = memory_tracker.diff(paths[base_seq], paths[target_seq], limit=limit)
+            diff["pid"] = pid
+            diff["alive"] = _pid_alive(pid)
+            diff["base_id"] = base_seq
+            diff["target_id"] = target_seq
+            diffs.append(diff)
+        if not diffs:
+            if base_id is None and target_id is None:
+                raise LookupError("At least two snapshots per worker are required")
+            raise LookupError(
+                f"No worker has snapshots {base_id or 'previous'} and {target_id or 'latest'}; "
+                f"only the last {self.MAX_MEMORY_SNAPSHOTS} are kept"
+            )
+        return diffs
+
+class ProfilingMiddleware:
+    """ASGI middleware feeding route-scoped profiling; a single attribute check when idle"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if sampling_profiler.route_pattern is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        claim = sampling_profiler.request_started(scope["path"])
+        if claim is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampling_profiler.request_finished(claim)
+
+sampling_profiler = SamplingProfiler()
+memory_tracker = MemoryTracker()
+profiling_coordinator = ProfilingCoordinator(settings.PROFILER_SHARED_DIR, settings.PROFILER_POLL_INTERVAL)
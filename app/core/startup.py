@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+class StartupMetrics:
+    """Startup timings and readiness state of the current worker"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.backend: Optional[str] = None
+        self.error: Optional[str] = None
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Record how long the wrapped block takes, in milliseconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] = round((time.perf_counter() - start) * 1000, 2)
+
+    def mark(self, phase: str) -> None:
+        """Record the time elapsed since the worker started importing the app"""
+        self.phases[phase] = round((time.perf_counter() - self.started_at) * 1000, 2)
+
+    def mark_ready(self, backend: str) -> None:
+        """Flag the worker as ready to serve Drive requests"""
+        self.backend = backend
+        self.error = None
+        self.ready = True
+        self.mark("ready")
+        print(f"Info: Worker ready ({backend}) - startup timings (ms): {self.phases}")
+
+    def report(self) -> dict:
+        """Return the collected state for the readiness endpoint"""
+        return {
+            "ready": self.ready,
+            "backend": self.backend,
+            "timings_ms": dict(self.phases),
+            "error": self.error,
+        }
+
+startup_metrics = StartupMetrics()
@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+from app.core.config import settings
+from app.core.fs import atomic_write
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always produced
+    brotli = None
+
+INLINE_STYLE_RE = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+INLINE_SCRIPT_RE = re.compile(r'<script>(.*?)</script>', re.DOTALL)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+MEDIA_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+}
+
+@dataclass
+class StaticAsset:
+    """A built asset together with its precompressed variants"""
+    media_type: str
+    cache_control: str
+    digest: str
+    # encoding ('br', 'gzip' or 'identity') -> (path, stat)
+    variants: Dict[str, Tuple[str, os.stat_result]] = field(default_factory=dict)
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}-{encoding}"'
+
+class StaticAssetPipeline:
+    """Builds the web client into hashed, precompressed assets and serves them.
+
+    The inline ``<style>`` and ``<script>`` blocks of ``index.html`` are moved
+    into content-hashed files that are cached forever, leaving a small
+    ``index.html`` entry point that browsers revalidate on every visit.
+    """
+
+    def __init__(self, source_dir: str, build_dir: str):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.assets: Dict[str, StaticAsset] = {}
+
+    @property
+    def ready(self) -> bool:
+        return 'index.html' in self.assets
+
+    def build(self) -> None:
+        """Extract, hash and compress the web client into the build directory"""
+        with open(os.path.join(self.source_dir, 'index.html'), encoding='utf-8') as f:
+            html = f.read()
+
+        assets: Dict[str, StaticAsset] = {}
+        html = self._extract(html, INLINE_STYLE_RE, '.css', '<link rel="stylesheet" href="/{}">', assets)
+        html = self._extract(html, INLINE_SCRIPT_RE, '.js', '<script src="/{}"></script>', assets)
+        assets['index.html'] = self._write('index.html', html.encode('utf-8'), REVALIDATE_CACHE_CONTROL)
+
+        self._prune(assets)
+        self.assets = assets
+
+    def _extract(self, html: str, pattern: re.Pattern, suffix: str, tag: str,
+                 assets: Dict[str, StaticAsset]) -> str:
+        """Move every inline block matching ``pattern`` into one hashed asset"""
+        blocks: List[str] = pattern.findall(html)
+        if not blocks:
+            return html
+        content = "\n".join(blocks).encode('utf-8')
+        name = f"assets/app.{hashlib.sha256(content).hexdigest()[:12]}{suffix}"
+        assets[name] = self._write(name, content, IMMUTABLE_CACHE_CONTROL)
+
+        replaced = False
+        def replace(match: re.Match) -> str:
+            nonlocal replaced
+            if replaced:
+                return ''
+            replaced = True
+            return tag.format(name)
+        return pattern.sub(replace, html)
+
+    def _write(self, name: str, content: bytes, cache_control: str) -> StaticAsset:
+        path = os.path.join(self.build_dir, name)
+        asset = StaticAsset(
+            media_type=MEDIA_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream'),
+            cache_control=cache_control,
+            digest=hashlib.sha256(content).hexdigest()[:16]
+        )
+        variants = {'identity': (path, content)}
+        variants['gzip'] = (path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            variants['br'] = (path + '.br', brotli.compress(content, quality=11))
+
+        for encoding, (variant_path, data) in variants.items():
+            if encoding != 'identity' and len(data) >= len(content):
+                continue
+            # Several workers may build at once
+            os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+            atomic_write(variant_path, data)
+            asset.variants[encoding] = (variant_path, os.stat(variant_path))
+        return asset
+
+    def _prune(self, assets: Dict[str, StaticAsset]) -> None:
+        """Remove hashed assets left over from previous builds"""
+        assets_dir = os.path.join(self.build_dir, 'assets')
+        keep = {os.path.basename(path) for asset in assets.values() for path, _ in asset.variants.values()}
+        for name in os.listdir(assets_dir) if os.path.isdir(assets_dir) else []:
+            if name.startswith('app.') and name not in keep:
+                try:
+                    os.unlink(os.path.join(assets_dir, name))
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _negotiate(accept_encoding: str, available: Dict[str, Tuple[str, os.stat_result]]) -> str:
+        """Pick the best precompressed variant the client accepts"""
+        accepted: Dict[str, float] = {}
+        for part in accept_encoding.split(','):
+            coding, _, params = part.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[coding.strip().lower()] = quality
+        for encoding in ('br', 'gzip'):
+            if encoding in available and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return 'identity'
+
+    def response(self, name: str, request: Request) -> Optional[Response]:
+        """Serve a built asset, or None if it does not exist"""
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+
+        encoding = self._negotiate(request.headers.get('accept-encoding', ''), asset.variants)
+        path, stat_result = asset.variants[encoding]
+        headers = {
+            'Cache-Control': asset.cache_control,
+            'ETag': asset.etag(encoding),
+            'Vary': 'Accept-Encoding',
+        }
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if '*' in tags or asset.etag(encoding) in tags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        # FileResponse uses the ASGI pathsend extension (zero-copy) when the server offers it
+        return FileResponse(path, headers=headers, media_type=asset.media_type, stat_result=stat_result)
+
+static_assets = StaticAssetPipeline(settings.STATIC_SOURCE_DIR, settings.STATIC_BUILD_DIR)
+
+if __name__ == "__main__":
+    static_assets.build()
+    for asset_name, built in static_assets.assets.items():
+        sizes = ", ".join(f"{encoding}={stat.st_size}" for encoding, (_, stat) in built.variants.items())
+        print(f"{asset_name}: {sizes}")
@@ -1,15 +1,48 @@
-from fastapi import FastAPI
+from app.core.startup import startup_metrics
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from app.core.config import settings
-from app.router.google_drive_router import router as drive_router
+from app.core.profiling import ProfilingMiddleware, profiling_coordinator
+from app.core.static_assets import static_assets
+from app.router.google_drive_router import router as drive_router, get_drive_manager
+from app.router.admin_router import router as admin_router
+from app.service.media_optimizer import media_optimizer
 import os
 
+startup_metrics.mark("import_app")
+
+def _warm_up_drive() -> None:
+    """Build the shared manager and warm up its Drive client"""
+    get_drive_manager().warm_up()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the Drive warm-up in the background so the worker accepts connections immediately"""
+    try:
+        with startup_metrics.measure("static_assets"):
+            static_assets.build()
+    except Exception as e:
+        print(f"Warning: Static asset build failed, serving app/static/index.html as is: {str(e)}")
+    warm_up_task = asyncio.create_task(asyncio.to_thread(_warm_up_drive))
+    if settings.ADMIN_TOKEN:
+        # Lets any worker's admin endpoints arm profiling in this one
+        profiling_coordinator.start_watcher()
+    yield
+    if settings.ADMIN_TOKEN:
+        profiling_coordinator.stop_watcher()
+    get_drive_manager().cancel_warm_up()
+    warm_up_task.cancel()
+    media_optimizer.shutdown()
+
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
-    description=settings.API_DESCRIPTION
+    description=settings.API_DESCRIPTION,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,16 +54,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Route-scoped profiling (no-op unless armed through the admin API)
+app.add_middleware(ProfilingMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Include routers
 app.include_router(drive_router)
+app.include_router(admin_router)
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint - Serve the web interface"""
-    return FileResponse("app/static/index.html")
+    if not static_assets.ready:
+        return FileResponse("app/static/index.html")
+    return static_assets.response("index.html", request)
+
+@app.get("/assets/{asset_name}")
+async def asset(asset_name: str, request: Request):
+    """Serve hashed, precompressed web client assets"""
+    response = static_assets.response(f"assets/{asset_name}", request)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return response
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,8 +1,13 @@
 from typing import List, Optional
 import os
+import threading
 from app.service.google_drive_service import GoogleDriveService
 from app.service.mock_drive_service import MockGoogleDriveService
+from app.service.media_optimizer import OptimizedMedia
+from app.core.config import settings
 from app.core.models import FileInfo, UploadResponse, FileListResponse
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.startup import startup_metrics
 from app.core.exceptions import (
     GoogleDriveException,
     AuthenticationException,
@@ -14,18 +19,71 @@ from app.core.exceptions import (
 class GoogleDriveManager:
     """Manager for Google Drive operations"""
     
-    def __init__(self):
+    def __init__(self, lazy: bool = False):
+        self._warm_up_cancelled = threading.Event()
         # Check if credentials file exists, use mock service if not
-        if os.path.exists('credentials.json'):
+        self.expects_drive = os.path.exists('credentials.json')
+        if self.expects_drive:
             try:
-                self.drive_service = GoogleDriveService()
-            except Exception:
+                # In lazy mode authentication is deferred to warm_up() or the first request
+                self.drive_service = GoogleDriveService(lazy=lazy)
+            except AuthenticationException as e:
                 print("Warning: Using mock service due to authentication issues")
+                startup_metrics.error = f"Authentication failed: {str(e)}"
                 self.drive_service = MockGoogleDriveService()
+            except Exception as e:
+                # Transient (network) failure: keep Drive and let warm_up() retry with backoff
+                print(f"Warning: Drive authentication failed, retrying during warm-up: {str(e)}")
+                startup_metrics.error = str(e)
+                self.drive_service = GoogleDriveService(lazy=True)
         else:
             print("Info: Using mock service (no credentials.json found)")
             self.drive_service = MockGoogleDriveService()
     
+    @property
+    def backend(self) -> str:
+        """Name of the active storage backend"""
+        return "mock" if isinstance(self.drive_service, MockGoogleDriveService) else "google_drive"
+    
+    def warm_up(self) -> bool:
+        """Prepare the Drive client ahead of the first request and flag the worker ready.
+        
+        Transient failures are retried with exponential backoff until warm-up
+        succeeds or cancel_warm_up() is called. The worker is never flagged ready
+        while credentials.json exists but uploads would go to the mock service.
+        """
+        delay = settings.DRIVE_WARMUP_RETRY_DELAY
+        attempt = 0
+        while not self._warm_up_cancelled.is_set():
+            attempt += 1
+            try:
+                warm_up = getattr(self.drive_service, 'warm_up', None)
+                if warm_up:
+                    warm_up()
+            except AuthenticationException as e:
+                print("Warning: Using mock service due to authentication issues")
+                startup_metrics.error = f"Authentication failed: {str(e)}"
+                self.drive_service = MockGoogleDriveService()
+            except Exception as e:
+                startup_metrics.error = str(e)
+                print(f"Warning: Drive warm-up attempt {attempt} failed, retrying in {delay:.0f}s: {str(e)}")
+                if self._warm_up_cancelled.wait(delay):
+                    return False
+                delay = min(delay * 2, settings.DRIVE_WARMUP_MAX_RETRY_DELAY)
+                continue
+            
+            if self.expects_drive and self.backend == "mock":
+                # Credentials are unusable; stay not ready so the probe keeps failing
+                print("Warning: credentials.json is present but Drive is unavailable; worker not ready")
+                return False
+            startup_metrics.mark_ready(self.backend)
+            return True
+        return False
+    
+    def cancel_warm_up(self) -> None:
+        """Stop a warm-up that is still retrying"""
+        self._warm_up_cancelled.set()
+    
     def upload_file(self, file_content: bytes, file_name: str, mime_type: str = None) -> UploadResponse:
         """Upload file to Google Drive"""
         try:
@@ -54,6 +112,29 @@ class GoogleDriveManager:
                 message=f"Unexpected error: {str(e)}"
             )
     
+    def upload_media(self, media: OptimizedMedia) -> UploadResponse:
+        """Upload the output of the media optimization stage, keeping the original if configured"""
+        response = self.upload_file(media.content, media.file_name, media.mime_type)
+        if not response.success:
+            return response
+        
+        response.original_size = media.original_size
+        response.uploaded_size = len(media.content)
+        response.bytes_saved = media.bytes_saved
+        
+        if media.optimized and settings.MEDIA_KEEP_ORIGINALS:
+            stem, ext = os.path.splitext(media.original_file_name)
+            original = self.upload_file(
+                media.original_content,
+                f"{stem}_original{ext}",
+                media.original_mime_type
+            )
+            response.original_file_id = original.file_id
+            if not original.success:
+                response.message = f"{response.message} (original not kept: {original.message})"
+        
+        return response
+    
     def get_file_info(self, file_id: str) -> Optional[FileInfo]:
         """Get file information by ID"""
         try:
@@ -64,13 +145,18 @@ class GoogleDriveManager:
             raise GoogleDriveException(f"Error getting file info: {str(e)}")
     
     def list_files(self, page_size: int = 10, page_token: str = None) -> FileListResponse:
-        """List files in Google Drive"""
+        """List files in Google Drive.
+        
+        Files are ordered by (created_time, id) on every backend, and page tokens
+        are opaque keyset cursors: they stay valid while files are added or deleted.
+        """
+        cursor = decode_cursor(page_token) if page_token else None
         try:
-            files, next_page_token = self.drive_service.list_files(page_size, page_token)
+            files, next_cursor = self.drive_service.list_files(page_size, cursor)
             
             return FileListResponse(
                 files=files,
-                next_page_token=next_page_token,
+                next_page_token=encode_cursor(next_cursor) if next_cursor else None,
                 total_count=len(files)
             )
             
@@ -107,7 +193,7 @@ class GoogleDriveManager:
         try:
             # This would need to be implemented in the service layer
             # For now, we'll use the list_files method
-            files, next_page_token = self.drive_service.list_files(page_size)
+            files, next_cursor = self.drive_service.list_files(page_size)
             
             # Filter files based on query (simple name matching)
             filtered_files = [
@@ -117,7 +203,7 @@ class GoogleDriveManager:
             
             return FileListResponse(
                 files=filtered_files,
-                next_page_token=next_page_token,
+                next_page_token=encode_cursor(next_cursor) if next_cursor else None,
                 total_count=len(filtered_files)
             )
             
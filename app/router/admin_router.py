@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Query, Depends, Header
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import secrets
+
+from app.core.config import settings
+from app.core.models import ProfilingStatus
+from app.core.profiling import profiling_coordinator
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+
+# Endpoints are plain functions: they do file I/O, join threads and walk large
+# heaps, so FastAPI runs them in the threadpool instead of on the event loop.
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Only allow requests carrying the configured admin token"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Compare bytes: Starlette decodes headers as latin-1, and compare_digest rejects non-ASCII str
+    if not x_admin_token or not secrets.compare_digest(
+        x_admin_token.encode('utf-8'), settings.ADMIN_TOKEN.encode('utf-8')
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.post("/profiling/start", response_model=ProfilingStatus, dependencies=[Depends(require_admin)])
+def start_profiling(
+    duration: Optional[float] = Query(None, gt=0),
+    route: Optional[str] = Query(None, min_length=1),
+    requests: Optional[int] = Query(None, ge=1),
+    idle: bool = Query(False),
+):
+    """Start sampling in every worker for a time window, or for the next N requests to a route.
+
+    ``route`` is a route template such as ``/api/v1/drive/files/{file_id}/download``,
+    or a path prefix ending in ``*``. The request budget is shared by all workers.
+    Route mode samples the whole process while those requests are in flight, so
+    concurrent requests to other routes show up too. Threads waiting for work are
+    left out unless ``idle`` is set.
+    """
+    if route and not requests:
+        raise HTTPException(status_code=400, detail="'requests' is required when profiling a route")
+    if not route and not duration:
+        raise HTTPException(status_code=400, detail="Either 'duration' or 'route' and 'requests' is required")
+    try:
+        return profiling_coordinator.arm(
+            duration=min(duration or settings.PROFILER_MAX_DURATION, settings.PROFILER_MAX_DURATION),
+            route=route,
+            requests=requests,
+            interval=settings.PROFILER_SAMPLE_INTERVAL_MS / 1000,
+            idle=idle
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/profiling/stop", response_model=ProfilingStatus, dependencies=[Depends(require_admin)])
+def stop_profiling():
+    """Stop the sampling profiler in every worker"""
+    return profiling_coordinator.disarm()
+
+@router.get("/profiling/status", response_model=ProfilingStatus, dependencies=[Depends(require_admin)])
+def profiling_status():
+    """Get sampling profiler status across workers"""
+    return profiling_coordinator.status()
+
+@router.get("/profiling/result", dependencies=[Depends(require_admin)])
+def profiling_result():
+    """Download the merged samples of all workers as collapsed stacks (flamegraph.pl / speedscope input)"""
+    status = profiling_coordinator.status()
+    if status["running"]:
+        raise HTTPException(status_code=409, detail="Profiler is still running")
+    collapsed = profiling_coordinator.collapsed()
+    if not collapsed:
+        raise HTTPException(status_code=404, detail="No profile collected")
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": "attachment; filename=profile.collapsed"}
+    )
+
+@router.post("/memory/snapshot", dependencies=[Depends(require_admin)])
+def memory_snapshot(frames: int = Query(25, ge=1, le=100)):
+    """Take a tracemalloc snapshot in every worker; the first call starts tracing"""
+    seq = profiling_coordinator.request_memory("snapshot", frames=frames)
+    return {
+        "snapshot_id": seq,
+        "message": f"Snapshot requested; workers take it within {settings.PROFILER_POLL_INTERVAL:g}s"
+    }
+
+@router.get("/memory/diff", dependencies=[Depends(require_admin)])
+def memory_diff(
+    base_id: Optional[int] = Query(None, ge=1),
+    target_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Compare two tracemalloc snapshots of each worker by ``snapshot_id`` (defaults to the last two)"""
+    try:
+        return {"workers": profiling_coordinator.memory_diff(base_id=base_id, target_id=target_id, limit=limit)}
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/memory/stop", dependencies=[Depends(require_admin)])
+def memory_stop():
+    """Stop tracemalloc and drop stored snapshots in every worker"""
+    profiling_coordinator.request_memory("stop")
+    return {"message": "Memory tracing stop requested"}
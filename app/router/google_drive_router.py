@@ -1,22 +1,36 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Depends, Response
 from fastapi.responses import StreamingResponse
 from typing import Optional
 import io
+import threading
 
 from app.manager.google_drive_manager import GoogleDriveManager
+from app.service.media_optimizer import media_optimizer
 from app.core.models import (
     FileInfo, 
     UploadResponse, 
     FileListResponse, 
-    ErrorResponse
+    ErrorResponse,
+    ReadinessResponse
 )
-from app.core.exceptions import GoogleDriveException
+from app.core.config import settings
+from app.core.exceptions import GoogleDriveException, InvalidPageTokenException
+from app.core.startup import startup_metrics
 
 router = APIRouter(prefix="/api/v1/drive", tags=["Google Drive"])
 
+_drive_manager: Optional[GoogleDriveManager] = None
+_drive_manager_lock = threading.Lock()
+
 def get_drive_manager() -> GoogleDriveManager:
-    """Dependency injection for Google Drive Manager"""
-    return GoogleDriveManager()
+    """Dependency injection for Google Drive Manager (one shared instance per worker)"""
+    global _drive_manager
+    if _drive_manager is None:
+        # The startup warm-up and the first request may race here; build exactly one
+        with _drive_manager_lock:
+            if _drive_manager is None:
+                _drive_manager = GoogleDriveManager(lazy=settings.DRIVE_LAZY_STARTUP)
+    return _drive_manager
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_file(
@@ -26,11 +40,12 @@ async def upload_file(
     """Upload file to Google Drive"""
     try:
         file_content = await file.read()
-        response = drive_manager.upload_file(
-            file_content=file_content,
+        media = await media_optimizer.optimize(
+            content=file_content,
             file_name=file.filename,
             mime_type=file.content_type
         )
+        response = drive_manager.upload_media(media)
         
         if not response.success:
             raise HTTPException(status_code=400, detail=response.message)
@@ -49,6 +64,8 @@ async def list_files(
     """List files in Google Drive"""
     try:
         return drive_manager.list_files(page_size=page_size, page_token=page_token)
+    except InvalidPageTokenException as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except GoogleDriveException as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -130,6 +147,14 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "Google Drive API"} 
 
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response):
+    """Readiness probe - succeeds only once the Drive warm-up has completed"""
+    report = startup_metrics.report()
+    if not report["ready"]:
+        response.status_code = 503
+    return ReadinessResponse(status="ready" if report["ready"] else "starting", **report)
+
 @router.get("/folder-link")
 async def get_folder_link(drive_manager: GoogleDriveManager = Depends(get_drive_manager)):
     """Return public Google Drive folder link for uploads"""
@@ -0,0 +1,126 @@
+import sys
+from bisect import bisect_right, insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.pagination import PageCursor
+
+class FileRecord:
+    """Compact file metadata record; FileInfo models are only built for returned pages"""
+
+    __slots__ = ('id', 'name', 'mime_type', 'size', 'created_us', 'modified_us')
+
+    def __init__(self, id: str, name: str, mime_type: str, size: Optional[int],
+                 created_us: int, modified_us: int):
+        self.id = id
+        self.name = name
+        # A handful of MIME types repeat across every file; share one string each
+        self.mime_type = sys.intern(mime_type)
+        self.size = size
+        self.created_us = created_us
+        self.modified_us = modified_us
+
+    @property
+    def key(self) -> PageCursor:
+        return PageCursor(self.created_us, self.id)
+
+class FileMetadataStore:
+    """File metadata ordered by (created_time, id) with keyset pagination.
+
+    Records live in a dict keyed by file ID; a sorted list of cursors gives
+    O(log n) seeks for a page, independent of how many pages came before.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, FileRecord] = {}
+        self._keys: List[PageCursor] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, file_id: str) -> bool:
+        return file_id in self._records
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        return (self._records[key.file_id] for key in self._keys)
+
+    def add(self, record: FileRecord) -> None:
+        """Insert or replace a record"""
+        if record.id in self._records:
+            self.remove(record.id)
+        insort(self._keys, record.key)
+        self._records[record.id] = record
+
+    def get(self, file_id: str) -> Optional[FileRecord]:
+        return self._records.get(file_id)
+
+    def remove(self, file_id: str) -> bool:
+        record = self._records.pop(file_id, None)
+        if record is None:
+            return False
+        index = bisect_right(self._keys, record.key) - 1
+        del self._keys[index]
+        return True
+
+    def page(self, limit: int, after: Optional[PageCursor] = None) -> Tuple[List[FileRecord], Optional[PageCursor]]:
+        """Return up to ``limit`` records following ``after`` and the cursor for the next page"""
+        start = bisect_right(self._keys, after) if after is not None else 0
+        keys = self._keys[start:start + limit]
+        next_cursor = keys[-1] if keys and start + limit < len(self._keys) else None
+        return [self._records[key.file_id] for key in keys], next_cursor
+
+if __name__ == "__main__":
+    # Memory benchmark: python -m app.service.file_metadata_store [count]
+    import time
+    import tracemalloc
+    import uuid
+    from datetime import datetime, timezone
+
+    from app.core.models import FileInfo
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    mime_types = [('image', 'jpeg'), ('image', 'heic'), ('video', 'mp4'), ('image', 'png')]
+    base_us = 1_700_000_000_000_000
+    rows = [
+        # Distinct MIME string objects per row, as decoded from an API response
+        (str(uuid.uuid4()), f"IMG_{i:06d}.jpg", '/'.join(mime_types[i % len(mime_types)]), 2_500_000 + i, base_us + i * 1000)
+        for i in range(count)
+    ]
+
+    tracemalloc.start()
+    models = {
+        file_id: FileInfo(
+            id=file_id,
+            name=name,
+            mime_type=mime_type,
+            size=size,
+            created_time=datetime.fromtimestamp(created_us / 1e6, tz=timezone.utc),
+            modified_time=datetime.fromtimestamp(created_us / 1e6, tz=timezone.utc),
+            web_view_link=f'https://drive.google.com/file/d/{file_id}/view'
+        )
+        for file_id, name, mime_type, size, created_us in rows
+    }
+    models_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+
+    tracemalloc.start()
+    store = FileMetadataStore()
+    for file_id, name, mime_type, size, created_us in rows:
+        store.add(FileRecord(file_id, name, mime_type, size, created_us, created_us))
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Walk the whole store one page at a time
+    started = time.perf_counter()
+    pages, cursor = 0, None
+    while True:
+        _, cursor = store.page(100, cursor)
+        pages += 1
+        if cursor is None:
+            break
+    elapsed = time.perf_counter() - started
+
+    print(f"{count} files")
+    print(f"  dict of FileInfo:   {models_bytes / 1024 / 1024:8.1f} MiB ({models_bytes // count} B/file)")
+    print(f"  FileMetadataStore:  {store_bytes / 1024 / 1024:8.1f} MiB ({store_bytes // count} B/file)")
+    print(f"  keyset walk: {pages} pages of 100 in {elapsed * 1000:.1f} ms ({elapsed / pages * 1e6:.1f} us/page)")
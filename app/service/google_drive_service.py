@@ -1,34 +1,77 @@
 import os
 import io
+import threading
 from typing import List, Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google.oauth2.service_account import Credentials as ServiceAccountCredentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
 from googleapiclient.errors import HttpError
 
 from app.core.config import settings
 from app.core.exceptions import (
+    GoogleDriveException,
     AuthenticationException, 
     FileNotFoundException, 
     PermissionException, 
     UploadException
 )
 from app.core.models import FileInfo
+from app.core.pagination import PageCursor
+from app.core.startup import startup_metrics
+
+# google.auth, google.oauth2 and googleapiclient.discovery are imported lazily:
+# they dominate worker import time and are only needed once the client is built.
 
 class GoogleDriveService:
     """Service for Google Drive operations"""
     
     SCOPES = ['https://www.googleapis.com/auth/drive']
+    WEDDING_FOLDER_NAME = "Düğün Anıları"
+    # Extra files requested per Drive call, so small createdTime tie groups need no second call
+    CURSOR_TIE_MARGIN = 10
+    
+    def __init__(self, lazy: bool = False):
+        self._service = None
+        self._folder_ids = {}
+        self._lock = threading.Lock()
+        if not lazy:
+            self._authenticate()
+    
+    @property
+    def service(self):
+        """Drive v3 client, built on first use"""
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._authenticate()
+        return self._service
+    
+    def warm_up(self) -> None:
+        """Load credentials, build the client and resolve the wedding folder.
+        
+        Raises AuthenticationException only for unusable credentials; transient
+        errors (network, Drive outages) propagate unchanged so callers can retry.
+        """
+        with startup_metrics.measure("drive_client"):
+            self.service
+        
+        with startup_metrics.measure("folder_lookup"):
+            folder_id = self._get_or_create_folder()
+        if not folder_id:
+            raise GoogleDriveException("Wedding folder could not be resolved")
     
-    def __init__(self):
-        self.service = None
-        self._authenticate()
+    def _build_client(self, creds):
+        """Build the Drive v3 client from the discovery document bundled with googleapiclient"""
+        with startup_metrics.measure("import_googleapiclient"):
+            from googleapiclient.discovery import build
+        with startup_metrics.measure("build_client"):
+            return build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
     
     def _authenticate(self):
         """Authenticate with Google Drive API. Prefer service account if provided."""
+        with startup_metrics.measure("import_google_auth"):
+            from google.auth.exceptions import RefreshError
+            from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
+            from google.oauth2.service_account import Credentials as ServiceAccountCredentials
+        
         creds = None
         
         # Prefer service account if the credentials.json is a service account key
@@ -38,27 +81,35 @@ class GoogleDriveService:
                     settings.GOOGLE_CREDENTIALS_FILE,
                     scopes=self.SCOPES
                 )
-                self.service = build('drive', 'v3', credentials=creds)
-                return
             except Exception:
                 # Not a service account file; continue with user OAuth flows
-                pass
+                creds = None
+            if creds is not None:
+                self._service = self._build_client(creds)
+                return
 
         # Fallback: user OAuth (requires token.json; not suitable for headless prod)
         if os.path.exists(settings.GOOGLE_TOKEN_FILE):
-            creds = Credentials.from_authorized_user_file(
-                settings.GOOGLE_TOKEN_FILE, self.SCOPES
-            )
+            try:
+                creds = Credentials.from_authorized_user_file(
+                    settings.GOOGLE_TOKEN_FILE, self.SCOPES
+                )
+            except ValueError as e:
+                raise AuthenticationException(f"Invalid OAuth token file: {str(e)}")
         
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+                try:
+                    creds.refresh(Request())
+                except RefreshError as e:
+                    # Revoked or expired grant; a TransportError is left to the caller's retry
+                    raise AuthenticationException(f"OAuth token refresh failed: {str(e)}")
             else:
                 raise AuthenticationException(
                     "OAuth token not found or invalid in server environment. Provide a Google service account key in credentials.json."
                 )
         
-        self.service = build('drive', 'v3', credentials=creds)
+        self._service = self._build_client(creds)
     
     def _ensure_public_permission(self, file_id: str) -> None:
         """Ensure the given file/folder is publicly readable via link."""
@@ -77,8 +128,18 @@ class GoogleDriveService:
                 return
             raise
 
-    def _get_or_create_folder(self, folder_name: str = "Düğün Anıları") -> str:
+    def _get_or_create_folder(self, folder_name: str = WEDDING_FOLDER_NAME) -> str:
         """Get or create a folder for wedding memories"""
+        if folder_name in self._folder_ids:
+            return self._folder_ids[folder_name]
+        
+        folder_id = self._find_or_create_folder(folder_name)
+        if folder_id:
+            self._folder_ids[folder_name] = folder_id
+        return folder_id
+    
+    def _find_or_create_folder(self, folder_name: str) -> str:
+        """Look up the folder on Drive, creating it if missing"""
         try:
             # Search for existing folder
             results = self.service.files().list(
@@ -113,6 +174,8 @@ class GoogleDriveService:
 
     def upload_file(self, file_content: bytes, file_name: str, mime_type: str = None) -> str:
         """Upload file to Google Drive"""
+        from googleapiclient.http import MediaIoBaseUpload
+        
         try:
             if not mime_type:
                 mime_type = 'application/octet-stream'
@@ -193,35 +256,65 @@ class GoogleDriveService:
             else:
                 raise FileNotFoundException(f"Error getting file info: {error}")
     
-    def list_files(self, page_size: int = 10, page_token: str = None) -> tuple[List[FileInfo], str]:
-        """List files in Google Drive"""
+    def list_files(self, page_size: int = 10, cursor: Optional[PageCursor] = None) -> tuple[List[FileInfo], Optional[PageCursor]]:
+        """List files in Google Drive, ordered by (created_time, id)"""
         try:
             # Get wedding folder
             folder_id = self._get_or_create_folder()
             
             # Query for files in the wedding folder
             query = f"'{folder_id}' in parents and trashed=false" if folder_id else "trashed=false"
+            if cursor is not None:
+                # Drive cannot filter on file ID, so resume from the cursor's timestamp
+                # and drop files at or before the cursor below
+                since = cursor.created_time.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+                query += f" and createdTime >= '{since}'"
             
-            results = self.service.files().list(
-                pageSize=page_size,
-                pageToken=page_token,
-                q=query,
-                fields="nextPageToken, files(id,name,mimeType,size,createdTime,modifiedTime,webViewLink)"
-            ).execute()
+            # Drive only orders by createdTime, so files sharing a timestamp come back in
+            # arbitrary order. Keep fetching until the tie group at the page boundary
+            # (and at the cursor) is complete, then break ties on ID locally.
+            candidates = []
+            drive_page_token = None
+            last_created_us = None
+            while True:
+                results = self.service.files().list(
+                    pageSize=page_size + self.CURSOR_TIE_MARGIN,
+                    pageToken=drive_page_token,
+                    q=query,
+                    orderBy='createdTime',
+                    fields="nextPageToken, files(id,name,mimeType,size,createdTime,modifiedTime,webViewLink)"
+                ).execute()
+                
+                for file in results.get('files', []):
+                    info = FileInfo(
+                        id=file.get('id'),
+                        name=file.get('name'),
+                        mime_type=file.get('mimeType'),
+                        size=int(file.get('size', 0)) if file.get('size') else None,
+                        created_time=file.get('createdTime'),
+                        modified_time=file.get('modifiedTime'),
+                        web_view_link=file.get('webViewLink')
+                    )
+                    key = PageCursor.for_file(info.created_time, info.id)
+                    last_created_us = key.created_us
+                    if cursor is None or key > cursor:
+                        candidates.append((key, info))
+                
+                drive_page_token = results.get('nextPageToken')
+                if not drive_page_token:
+                    break
+                if len(candidates) > page_size:
+                    candidates.sort(key=lambda item: item[0])
+                    # Files tied with the last one on our page may still be on later Drive pages
+                    if last_created_us > candidates[page_size - 1][0].created_us:
+                        break
             
-            files = []
-            for file in results.get('files', []):
-                files.append(FileInfo(
-                    id=file.get('id'),
-                    name=file.get('name'),
-                    mime_type=file.get('mimeType'),
-                    size=int(file.get('size', 0)) if file.get('size') else None,
-                    created_time=file.get('createdTime'),
-                    modified_time=file.get('modifiedTime'),
-                    web_view_link=file.get('webViewLink')
-                ))
+            candidates.sort(key=lambda item: item[0])
+            page = candidates[:page_size]
+            has_more = len(candidates) > page_size or bool(drive_page_token)
+            next_cursor = page[-1][0] if page and has_more else None
             
-            return files, results.get('nextPageToken')
+            return [file for _, file in page], next_cursor
             
         except HttpError as error:
             if error.resp.status == 403:
@@ -245,6 +338,8 @@ class GoogleDriveService:
     
     def download_file(self, file_id: str) -> bytes:
         """Download file from Google Drive"""
+        from googleapiclient.http import MediaIoBaseDownload
+        
         try:
             request = self.service.files().get_media(fileId=file_id)
             file = io.BytesIO()
@@ -0,0 +1,197 @@
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+# Pillow (and pillow-heif for HEIC) are optional and only imported inside the
+# pool workers, so the API process never pays for them.
+
+OPTIMIZABLE_MIME_TYPES = {
+    'image/jpeg',
+    'image/jpg',
+    'image/png',
+    'image/webp',
+    'image/heic',
+    'image/heif',
+}
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Image.info keys that carry EXIF/XMP/IPTC/comment metadata across Pillow's decoders
+METADATA_INFO_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop', 'iptc')
+
+@dataclass
+class OptimizedMedia:
+    """Result of the media optimization stage for a single upload"""
+    content: bytes
+    file_name: str
+    mime_type: Optional[str]
+    original_content: bytes
+    original_file_name: str
+    original_mime_type: Optional[str]
+
+    @property
+    def optimized(self) -> bool:
+        return self.content is not self.original_content
+
+    @property
+    def original_size(self) -> int:
+        return len(self.original_content)
+
+    @property
+    def bytes_saved(self) -> int:
+        return len(self.original_content) - len(self.content)
+
+def optimize_image(content: bytes, mime_type: str, threshold_bytes: int,
+                   quality: int, max_dimension: int) -> Optional[Tuple[bytes, str]]:
+    """Strip metadata, apply EXIF orientation and re-encode large images.
+
+    Runs inside a pool process. Returns ``(content, mime_type)`` or ``None`` when
+    the image should be uploaded unchanged.
+    """
+    try:
+        from PIL import Image, ImageOps, JpegImagePlugin
+    except ImportError:
+        return None
+    try:
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+    except ImportError:
+        pass
+
+    try:
+        image = Image.open(io.BytesIO(content))
+        image.load()
+    except Exception:
+        return None
+
+    source_format = image.format
+    exif = image.getexif()
+    rotated = exif.get(EXIF_ORIENTATION_TAG, 1) != 1
+    has_metadata = (
+        bool(exif)
+        or any(image.info.get(key) for key in METADATA_INFO_KEYS)
+        or bool(getattr(image, 'text', None))  # PNG tEXt/iTXt chunks
+    )
+    # Phone cameras often write MPO (a JPEG primary image plus gain map/depth frames)
+    is_jpeg = source_format in ('JPEG', 'MPO')
+    # JPEG output needs RGB/L; a converted image no longer has JPEG quantization tables to keep
+    needs_conversion = source_format not in ('PNG', 'WEBP') and image.mode not in ('RGB', 'L')
+    reencode = (
+        len(content) > threshold_bytes
+        or rotated
+        or needs_conversion
+        or not (is_jpeg or source_format in ('PNG', 'WEBP'))
+    )
+
+    if reencode:
+        image = ImageOps.exif_transpose(image)
+        if max_dimension and max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    output = io.BytesIO()
+    icc_profile = image.info.get('icc_profile')
+    if source_format == 'PNG':
+        image.save(output, format='PNG', optimize=True, icc_profile=icc_profile)
+        target_mime = 'image/png'
+    elif source_format == 'WEBP':
+        image.save(output, format='WEBP', quality=quality, icc_profile=icc_profile)
+        target_mime = 'image/webp'
+    else:
+        # JPEG, MPO and HEIF all end up as baseline JPEG; only the primary MPO frame is kept
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        if reencode:
+            image.save(output, format='JPEG', quality=quality, optimize=True, icc_profile=icc_profile)
+        else:
+            # Same as quality='keep' (original quantization tables and subsampling, only
+            # metadata dropped), which Pillow refuses for MPO sources
+            image.save(
+                output,
+                format='JPEG',
+                qtables=image.quantization,
+                subsampling=JpegImagePlugin.get_sampling(image),
+                optimize=True,
+                icc_profile=icc_profile
+            )
+        target_mime = 'image/jpeg'
+
+    optimized = output.getvalue()
+    # Metadata (GPS included) is always stripped; otherwise only keep a smaller result
+    if len(optimized) >= len(content) and not rotated and not has_metadata:
+        return None
+    return optimized, target_mime
+
+class MediaOptimizer:
+    """Optional pre-upload stage that shrinks photos in a process pool"""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.MEDIA_OPTIMIZATION_ENABLED
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: the API worker already runs threads, which fork does not handle safely
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.MEDIA_OPTIMIZER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    async def optimize(self, content: bytes, file_name: str, mime_type: str = None) -> OptimizedMedia:
+        """Run the optimization stage for an upload without blocking the event loop"""
+        media = OptimizedMedia(
+            content=content,
+            file_name=file_name,
+            mime_type=mime_type,
+            original_content=content,
+            original_file_name=file_name,
+            original_mime_type=mime_type
+        )
+        if not self.enabled or (mime_type or '').lower() not in OPTIMIZABLE_MIME_TYPES:
+            return media
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._get_pool(),
+                optimize_image,
+                content,
+                mime_type.lower(),
+                settings.MEDIA_REENCODE_THRESHOLD_BYTES,
+                settings.MEDIA_JPEG_QUALITY,
+                settings.MEDIA_MAX_DIMENSION
+            )
+        except BrokenProcessPool as e:
+            # A crashed worker poisons the pool; start a fresh one on the next upload
+            self._pool = None
+            print(f"Warning: Media optimization failed for {file_name}: {str(e)}")
+            return media
+        except Exception as e:
+            print(f"Warning: Media optimization failed for {file_name}: {str(e)}")
+            return media
+
+        if result is None:
+            return media
+
+        media.content, media.mime_type = result
+        if mime_type.lower() in ('image/heic', 'image/heif'):
+            stem, _ = os.path.splitext(file_name)
+            media.file_name = f"{stem}.jpg"
+        return media
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+media_optimizer = MediaOptimizer()
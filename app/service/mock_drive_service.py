@@ -5,18 +5,20 @@ from datetime import datetime
 import uuid
 
 from app.core.models import FileInfo
+from app.core.pagination import PageCursor, to_epoch_us, from_epoch_us
 from app.core.exceptions import (
     AuthenticationException, 
     FileNotFoundException, 
     PermissionException, 
     UploadException
 )
+from app.service.file_metadata_store import FileMetadataStore, FileRecord
 
 class MockGoogleDriveService:
     """Mock service for testing without Google Drive API"""
     
     def __init__(self):
-        self.files = {}
+        self.store = FileMetadataStore()
         self._create_sample_files()
     
     def _create_sample_files(self):
@@ -61,7 +63,26 @@ class MockGoogleDriveService:
         ]
         
         for file_data in sample_files:
-            self.files[file_data['id']] = FileInfo(**file_data)
+            self.store.add(FileRecord(
+                id=file_data['id'],
+                name=file_data['name'],
+                mime_type=file_data['mime_type'],
+                size=file_data['size'],
+                created_us=to_epoch_us(file_data['created_time']),
+                modified_us=to_epoch_us(file_data['modified_time'])
+            ))
+    
+    def _to_file_info(self, record: FileRecord) -> FileInfo:
+        """Build the API model for a stored record"""
+        return FileInfo(
+            id=record.id,
+            name=record.name,
+            mime_type=record.mime_type,
+            size=record.size,
+            created_time=from_epoch_us(record.created_us),
+            modified_time=from_epoch_us(record.modified_us),
+            web_view_link=f'https://drive.google.com/file/d/{record.id}/view'
+        )
     
     def upload_file(self, file_content: bytes, file_name: str, mime_type: str = None) -> str:
         """Upload file to mock Google Drive"""
@@ -69,59 +90,44 @@ class MockGoogleDriveService:
             mime_type = 'application/octet-stream'
         
         file_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat() + 'Z'
+        now = to_epoch_us(datetime.utcnow())
         
-        self.files[file_id] = FileInfo(
+        self.store.add(FileRecord(
             id=file_id,
             name=file_name,
             mime_type=mime_type,
             size=len(file_content),
-            created_time=now,
-            modified_time=now,
-            web_view_link=f'https://drive.google.com/file/d/{file_id}/view'
-        )
+            created_us=now,
+            modified_us=now
+        ))
         
         return file_id
     
     def get_file_info(self, file_id: str) -> FileInfo:
         """Get file information by ID"""
-        if file_id not in self.files:
+        record = self.store.get(file_id)
+        if record is None:
             raise FileNotFoundException(f"File not found: {file_id}")
         
-        return self.files[file_id]
+        return self._to_file_info(record)
     
-    def list_files(self, page_size: int = 10, page_token: str = None) -> tuple[List[FileInfo], str]:
-        """List files in mock Google Drive"""
-        files_list = list(self.files.values())
-        
-        # Simple pagination
-        start = 0
-        if page_token:
-            try:
-                start = int(page_token)
-            except ValueError:
-                start = 0
-        
-        end = start + page_size
-        page_files = files_list[start:end]
-        
-        next_page_token = str(end) if end < len(files_list) else None
-        
-        return page_files, next_page_token
+    def list_files(self, page_size: int = 10, cursor: Optional[PageCursor] = None) -> tuple[List[FileInfo], Optional[PageCursor]]:
+        """List files in mock Google Drive, ordered by (created_time, id)"""
+        records, next_cursor = self.store.page(page_size, cursor)
+        return [self._to_file_info(record) for record in records], next_cursor
     
     def delete_file(self, file_id: str) -> bool:
         """Delete file from mock Google Drive"""
-        if file_id not in self.files:
+        if not self.store.remove(file_id):
             raise FileNotFoundException(f"File not found: {file_id}")
         
-        del self.files[file_id]
         return True
     
     def download_file(self, file_id: str) -> bytes:
         """Download file from mock Google Drive"""
-        if file_id not in self.files:
+        record = self.store.get(file_id)
+        if record is None:
             raise FileNotFoundException(f"File not found: {file_id}")
         
         # Return mock file content
-        file_info = self.files[file_id]
-        return f"Mock content for {file_info.name}".encode('utf-8') 
\ No newline at end of file
+        return f"Mock content for {record.name}".encode('utf-8') 
\ No newline at end of file
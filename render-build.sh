@@ -24,6 +24,10 @@ echo "🔐 Setting up Google Drive credentials..."
 cp credentials.json /opt/render/project/src/credentials.json
 cp credentials.json credentials.json.bak
 
+# Build hashed, precompressed web client assets
+echo "🗜️ Building static assets..."
+python -m app.core.static_assets
+
 # Clear any cached files
 echo "🧹 Clearing cache..."
 find . -name "*.pyc" -delete